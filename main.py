@@ -2,24 +2,39 @@
 
 import os
 import sys
+import json
 import logging
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import threading
+import queue
+import time
+import shutil
+import hashlib
+import tarfile
+import tempfile
+import urllib.request
 from pathlib import Path
 import warnings
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+import soundfile as sf
 
 # ===============================
 # Suppress TensorFlow and Python Warnings
 # ===============================
 
-# Suppress TensorFlow logging before importing it
+# Suppress TensorFlow logging before it is imported by load_spleeter
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress INFO, WARNING, and ERROR messages
 
-# Import TensorFlow after setting the environment variable
-import tensorflow as tf
-tf.get_logger().setLevel('ERROR')  # Set TensorFlow logger to ERROR
-logging.getLogger('tensorflow').setLevel(logging.ERROR)  # Further suppress TensorFlow logs
+# Enable oneDNN CPU kernels, which pack weights into their preferred layout on first use,
+# unless the user has set TF_ENABLE_ONEDNN_OPTS themselves
+os.environ.setdefault('TF_ENABLE_ONEDNN_OPTS', '1')
+
+# Let TensorFlow grow GPU memory on demand. Unlike tf.config's memory growth this also
+# applies to Spleeter's estimator session, which otherwise reserves 70% of the GPU.
+os.environ.setdefault('TF_FORCE_GPU_ALLOW_GROWTH', 'true')
 
 # Suppress Python deprecation warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -55,21 +70,658 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+def physical_core_cpus():
+    """
+    Returns one CPU per physical core among the CPUs the process may run on,
+    using the hyperthread sibling lists Linux exposes in sysfs.
+
+    Returns:
+        set: CPU numbers, or all allowed CPUs if the topology cannot be read.
+    """
+    allowed = os.sched_getaffinity(0)
+    cpus = set()
+    seen_cores = set()
+    for cpu in sorted(allowed):
+        try:
+            with open(f'/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list', 'r') as f:
+                siblings = f.read().strip()
+        except OSError:
+            return allowed
+        # All hyperthreads of a core share the same sibling list
+        if siblings not in seen_cores:
+            seen_cores.add(siblings)
+            cpus.add(cpu)
+    return cpus
+
+def pin_to_physical_cores():
+    """
+    Restricts the calling thread, and the threads it starts, to one CPU per physical core.
+    TensorFlow sizes its default thread pools from this affinity mask when it starts up,
+    so its sessions then use one thread per physical core instead of one per hyperthread.
+    Does nothing on platforms without sched_setaffinity.
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return
+    cpus = physical_core_cpus()
+    try:
+        os.sched_setaffinity(0, cpus)
+        logging.info(f"Pinned thread to CPUs {sorted(cpus)}.")
+    except OSError as e:
+        logging.warning(f"Could not set CPU affinity: {e}")
+
+# Settings persisted between launches
+SETTINGS_PATH = os.path.join(os.path.expanduser('~'), '.spleeter_gui.json')
+
+def load_settings():
+    """
+    Loads the input files, output directory and stem count used last time.
+
+    Returns:
+        dict: Saved settings, or an empty dict if none could be read.
+    """
+    try:
+        with open(SETTINGS_PATH, 'r') as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return settings if isinstance(settings, dict) else {}
+
+def save_settings(audio_paths, output_directory, stems):
+    """
+    Saves the current input files, output directory and stem count for the next launch.
+    """
+    try:
+        with open(SETTINGS_PATH, 'w') as f:
+            json.dump({'in': audio_paths, 'out': output_directory, 'stems': stems}, f)
+    except OSError as e:
+        logging.warning(f"Could not save settings: {e}")
+
 # ===============================
 # Set Up Local Cache Directory for Spleeter
 # ===============================
 
-from spleeter.separator import Separator
-
-# Define the local cache directory relative to the executable or script
+# Define the local cache directory next to the executable or script. It must persist
+# between launches, so a PyInstaller build keeps it beside the executable rather than
+# in its temporary _MEIPASS folder, which is deleted on exit. SPLEETER_FAST_CACHE can
+# point at a faster disk, e.g. an NVMe drive; the cache gets its own folder inside it.
 CACHE_DIR_NAME = 'spleeter_models'
-CACHE_DIR = resource_path(CACHE_DIR_NAME)
+if os.environ.get('SPLEETER_FAST_CACHE'):
+    CACHE_DIR = os.path.join(os.environ['SPLEETER_FAST_CACHE'], CACHE_DIR_NAME)
+elif getattr(sys, 'frozen', False):
+    CACHE_DIR = os.path.join(os.path.dirname(sys.executable), CACHE_DIR_NAME)
+else:
+    CACHE_DIR = os.path.join(os.path.abspath("."), CACHE_DIR_NAME)
+
+# Maximum total size of the downloaded models kept in the cache directory. The three
+# models take roughly 430 MB together, so the default keeps the two most recently used.
+DEFAULT_MODEL_CACHE_MAX_BYTES = 384 * 1024 ** 2
+try:
+    MODEL_CACHE_MAX_BYTES = int(os.environ.get('SPLEETER_CACHE_MAX_BYTES', DEFAULT_MODEL_CACHE_MAX_BYTES))
+except ValueError:
+    logging.warning("Ignoring invalid SPLEETER_CACHE_MAX_BYTES; using the default model cache size.")
+    MODEL_CACHE_MAX_BYTES = DEFAULT_MODEL_CACHE_MAX_BYTES
+
+# Ensure the cache directory exists, falling back to the user's home directory
+# when the chosen location is not writable (e.g. an install under Program Files)
+try:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+except OSError as e:
+    logging.warning(f"Cannot create model cache {CACHE_DIR} ({e}); using the home directory.")
+    CACHE_DIR = os.path.join(os.path.expanduser('~'), '.' + CACHE_DIR_NAME)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+# Point Spleeter at the cache directory. Spleeter reads MODEL_PATH when it is
+# imported, so this must be set before load_spleeter runs.
+os.environ['MODEL_PATH'] = CACHE_DIR
+
+# Release the pretrained models and their checksum index are downloaded from
+MODEL_RELEASE_URL = 'https://github.com/deezer/spleeter/releases/download/v1.4.0'
+
+# Per-file SHA256 manifest written into each verified model directory
+MODEL_MANIFEST_NAME = '.sha256.json'
+
+# Prefix of the temporary files and directories used while downloading a model
+MODEL_DOWNLOAD_PREFIX = '.download-'
+
+# Seconds a model download may stall before it is abandoned
+MODEL_DOWNLOAD_TIMEOUT = 60
+
+def directory_size(path):
+    """
+    Returns the total size in bytes of all files below a directory.
+    """
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
+
+def ensure_model_local(stems):
+    """
+    Marks the model for the given number of stems as recently used and evicts the
+    least recently used model directories until the cache fits in MODEL_CACHE_MAX_BYTES.
+    Called once the model is in the cache, so its own size counts towards the budget.
+    Only Spleeter model directories are considered, and models of separators that
+    are already loaded are never evicted.
+
+    Args:
+        stems (int): Number of stems of the model about to be loaded.
+    """
+    model_dir = os.path.join(CACHE_DIR, f"{stems}stems")
+    if os.path.isdir(model_dir):
+        os.utime(model_dir)  # Access times are unreliable on relatime/noatime mounts
+
+    protected = {os.path.join(CACHE_DIR, f"{s}stems") for s in SEPARATORS}
+    protected.add(model_dir)
+
+    model_names = {f"{s}stems" for s in STEM_MODELS}
+    entries = []
+    for entry in os.scandir(CACHE_DIR):
+        if entry.name in model_names and entry.is_dir(follow_symlinks=False):
+            entries.append((entry.stat().st_atime, entry.path, directory_size(entry.path)))
+
+    total = sum(size for _, _, size in entries)
+    for _, path, size in sorted(entries):
+        if total <= MODEL_CACHE_MAX_BYTES:
+            break
+        if path in protected:
+            continue
+        logging.info(f"Evicting cached model {path} ({size} bytes).")
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+def file_sha256(path):
+    """
+    Returns the hex SHA256 digest of a file, read in 1 MiB blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def write_model_manifest(model_dir):
+    """
+    Records the SHA256 of every file in a model directory, and the probe file
+    Spleeter checks before deciding whether to download a model.
+    """
+    manifest = {
+        name: file_sha256(os.path.join(model_dir, name))
+        for name in os.listdir(model_dir)
+        if name != MODEL_MANIFEST_NAME and os.path.isfile(os.path.join(model_dir, name))
+    }
+    with open(os.path.join(model_dir, MODEL_MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f)
+    with open(os.path.join(model_dir, '.probe'), 'w') as f:
+        f.write('OK')
+
+def model_is_valid(model_dir):
+    """
+    Checks a model directory's files against the SHA256 manifest written when it was
+    downloaded and verified. A directory without a manifest, e.g. one Spleeter downloaded
+    itself, cannot be verified and is treated as invalid so it is fetched again.
+
+    Returns:
+        bool: True if the model's weights are present and intact.
+    """
+    if not os.path.isfile(os.path.join(model_dir, 'model.data-00000-of-00001')):
+        return False
+
+    manifest_path = os.path.join(model_dir, MODEL_MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    for name, digest in manifest.items():
+        path = os.path.join(model_dir, name)
+        if not os.path.isfile(path) or file_sha256(path) != digest:
+            logging.warning(f"Cached model file {path} is missing or corrupt.")
+            return False
+    return True
+
+def remove_stale_downloads():
+    """
+    Removes temporary files and directories left in CACHE_DIR by an interrupted model download.
+    """
+    for entry in os.scandir(CACHE_DIR):
+        if entry.name.startswith(MODEL_DOWNLOAD_PREFIX):
+            logging.info(f"Removing incomplete download {entry.path}.")
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                os.remove(entry.path)
+
+def ensure_model(stems):
+    """
+    Makes sure the pretrained model for the given number of stems is in CACHE_DIR and intact,
+    so Separator never has to download it. A missing or unverified model is downloaded.
+    If that fails, e.g. when offline, a complete model Spleeter itself downloaded or that
+    was copied in by hand is used without verification rather than failing the separation.
+
+    Args:
+        stems (int): Number of stems of the model about to be loaded.
+    """
+    name = f"{stems}stems"
+    model_dir = os.path.join(CACHE_DIR, name)
+    if model_is_valid(model_dir):
+        return
+
+    try:
+        download_model(name, model_dir)
+    except Exception as e:
+        if (os.path.isfile(os.path.join(model_dir, '.probe'))
+                and os.path.isfile(os.path.join(model_dir, 'model.data-00000-of-00001'))):
+            logging.warning(f"Could not download model {name} ({e}); using the unverified copy in {model_dir}.")
+            return
+        raise
+
+def download_model(name, model_dir):
+    """
+    Downloads a pretrained model, checks it against Spleeter's published checksum
+    and moves it into place atomically.
+
+    Args:
+        name (str): Model name, e.g. '2stems'.
+        model_dir (str): Directory the model is installed to.
+    """
+    remove_stale_downloads()
+
+    logging.info(f"Downloading model {name}.")
+    with urllib.request.urlopen(f"{MODEL_RELEASE_URL}/checksum.json", timeout=MODEL_DOWNLOAD_TIMEOUT) as response:
+        checksums = json.load(response)
+
+    fd, archive_path = tempfile.mkstemp(prefix=MODEL_DOWNLOAD_PREFIX, suffix='.tar.gz', dir=CACHE_DIR)
+    os.close(fd)
+    extract_dir = tempfile.mkdtemp(prefix=MODEL_DOWNLOAD_PREFIX, dir=CACHE_DIR)
+    try:
+        with urllib.request.urlopen(f"{MODEL_RELEASE_URL}/{name}.tar.gz", timeout=MODEL_DOWNLOAD_TIMEOUT) as response:
+            with open(archive_path, 'wb') as f:
+                shutil.copyfileobj(response, f)
+        if file_sha256(archive_path) != checksums.get(name):
+            raise IOError(f"Checksum mismatch for downloaded model {name}.")
+
+        with tarfile.open(archive_path) as tar:
+            if hasattr(tarfile, 'data_filter'):
+                tar.extractall(extract_dir, filter='data')
+            else:
+                tar.extractall(extract_dir)
+        write_model_manifest(extract_dir)
+
+        if os.path.isdir(model_dir):
+            shutil.rmtree(model_dir)
+        os.replace(extract_dir, model_dir)
+        logging.info(f"Model {name} downloaded and verified.")
+    finally:
+        os.remove(archive_path)
+        shutil.rmtree(extract_dir, ignore_errors=True)
+
+# ===============================
+# Deferred Spleeter Import
+# ===============================
+
+# TensorFlow and Spleeter take seconds to import, so they are imported in a background
+# thread while the window is already shown. Separator is bound as a module global
+# by load_spleeter; spleeter_ready is set once it is available.
+Separator = None
+spleeter_ready = threading.Event()
+
+# Size of TensorFlow's inter-op thread pool; Spleeter's graph has little op-level parallelism
+INTER_OP_THREADS = 2
+
+def load_spleeter():
+    """
+    Imports TensorFlow and Spleeter in the background, then preloads the default model.
+    """
+    # TensorFlow starts its thread pools from this thread, so pin before importing it
+    pin_to_physical_cores()
+
+    # Session thread pools honour these variables, including Spleeter's estimator session.
+    # The intra-op pool defaults to the CPUs in the affinity mask set above.
+    os.environ.setdefault('TF_NUM_INTEROP_THREADS', str(INTER_OP_THREADS))
+    if hasattr(os, 'sched_getaffinity'):
+        default_intra_op = len(os.sched_getaffinity(0))
+    else:
+        default_intra_op = os.cpu_count() or 1
+    intra_op = os.environ.get('TF_NUM_INTRAOP_THREADS', default_intra_op)
+    logging.info(f"TensorFlow threads: {intra_op} intra-op, {os.environ['TF_NUM_INTEROP_THREADS']} inter-op.")
+
+    try:
+        import tensorflow as tf
+        tf.get_logger().setLevel('ERROR')  # Set TensorFlow logger to ERROR
+        logging.getLogger('tensorflow').setLevel(logging.ERROR)  # Further suppress TensorFlow logs
+
+        # Spleeter places the separation graph itself: on the first GPU when
+        # TensorFlow sees one, otherwise on the CPU
+        gpus = tf.config.list_physical_devices('GPU')
+        logging.info(f"Separation device: {'GPU (' + gpus[0].name + ')' if gpus else 'CPU'}.")
+        if gpus:
+            globals()['STFT_BACKEND'] = 'tensorflow'
+
+        from spleeter.separator import Separator
+    except Exception as e:
+        logging.error(f"Failed to import TensorFlow or Spleeter: {e}")
+        root.after(0, lambda e=e: messagebox.showerror("Error", f"Spleeter could not be loaded:\n{e}"))
+        return
+
+    globals()['Separator'] = Separator
+    spleeter_ready.set()
+    logging.info("TensorFlow and Spleeter imported.")
+
+    preload_separator()
 
-# Ensure the cache directory exists
-os.makedirs(CACHE_DIR, exist_ok=True)
+def check_ready():
+    """
+    Polls from the Tk event loop until Spleeter is imported, then enables the separation button.
+    """
+    if spleeter_ready.is_set():
+        separate_button.config(state='normal')
+    else:
+        root.after(50, check_ready)
+
+# ===============================
+# Separator Cache
+# ===============================
 
-# Set the Spleeter cache directory environment variable
-os.environ['Spleeter_CACHE_DIR'] = CACHE_DIR  # Corrected environment variable name
+# Spleeter model descriptor for each supported number of stems
+STEM_MODELS = {
+    2: 'spleeter:2stems',
+    4: 'spleeter:4stems',
+    5: 'spleeter:5stems',
+}
+
+# STFT backend passed to every Separator. load_spleeter switches it to 'tensorflow'
+# when a GPU is detected, so the STFT/ISTFT run with tf.signal (cuFFT) on the same
+# device as the U-Net and the spectrogram never leaves it. On CPU-only machines
+# Spleeter's 'auto' choice of librosa is kept, as it is faster and uses less memory there.
+STFT_BACKEND = 'auto'  # spleeter.audio.STFTBackend values
+
+# Separators are expensive to build (model download + TF graph construction),
+# so a single instance per stem count is created and reused for every
+# separation for the lifetime of the application.
+SEPARATORS = {}
+separators_lock = threading.Lock()
+
+def get_separator(stems):
+    """
+    Returns the cached Separator for the given number of stems, building it on first use.
+
+    Args:
+        stems (int): Number of stems (2, 4, or 5).
+
+    Returns:
+        Separator: The shared Separator instance for this stem count.
+    """
+    if stems not in STEM_MODELS:
+        raise ValueError("Unsupported number of stems. Please choose between 2, 4, or 5.")
+
+    with separators_lock:
+        separator = SEPARATORS.get(stems)
+        if separator is None:
+            logging.info(f"Loading Spleeter model {STEM_MODELS[stems]}.")
+            ensure_model(stems)
+            ensure_model_local(stems)
+            # Stems are written by chunk_and_separate, so Spleeter's writer process pool is not needed
+            separator = Separator(STEM_MODELS[stems], stft_backend=STFT_BACKEND, multiprocess=False)
+            warm_up_separator(separator)
+            SEPARATORS[stems] = separator
+    return separator
+
+def warm_up_separator(separator):
+    """
+    Runs one second of silence through a new Separator so the prediction graph is built
+    and the weights are packed once, before the first real file is separated.
+
+    Args:
+        separator (Separator): Freshly constructed Separator.
+    """
+    start = time.perf_counter()
+    separator.separate(np.zeros((separator._sample_rate, 2), dtype=np.float32))
+    logging.info(f"Separator warm-up took {time.perf_counter() - start:.1f}s.")
+
+def preload_separator():
+    """
+    Builds the default 2-stem Separator in the background at startup,
+    so the first separation does not have to wait for it.
+    """
+    try:
+        get_separator(2)
+        logging.info("Default Spleeter model preloaded.")
+    except Exception as e:
+        logging.error(f"Model preload failed: {e}")
+
+# ===============================
+# Streaming Separation
+# ===============================
+
+# Sample rate of all Spleeter pretrained models; input is resampled to it while decoding
+MODEL_SAMPLE_RATE = 44100
+
+# Spleeter's U-Net works on segments of SEGMENT_FRAMES STFT frames and stacks all
+# segments of a waveform into a single [segments, T, F, 2] batch per graph call.
+# Chunks are sized so that a chunk plus its overlap fills BATCH_SEGMENTS segments
+# (the STFT adds FRAME_LENGTH / HOP_LENGTH frames of padding, one more is kept as
+# margin), so every call runs one full batch and no partially padded segment.
+SEGMENT_FRAMES = 512
+FRAME_LENGTH = 4096
+HOP_LENGTH = 1024
+BATCH_SEGMENTS = 4
+BATCH_SAMPLES = (BATCH_SEGMENTS * SEGMENT_FRAMES - FRAME_LENGTH // HOP_LENGTH - 1) * HOP_LENGTH
+
+# Length in samples of the cross-faded overlap between chunks (1 second) and of
+# the step from one chunk to the next
+OVERLAP_SAMPLES = MODEL_SAMPLE_RATE
+CHUNK_SAMPLES = BATCH_SAMPLES - OVERLAP_SAMPLES
+
+# Number of decoded chunks buffered ahead of the separator
+PREFETCH_CHUNKS = 4
+
+def put_unless_stopped(chunk_queue, item, stop):
+    """
+    Puts an item on a bounded queue, giving up once stop is set so the producer never blocks forever.
+    """
+    while not stop.is_set():
+        try:
+            chunk_queue.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+
+def prefetch_audio(audio_path, chunk_queue, stop, chunk_samples=CHUNK_SAMPLES, overlap_samples=OVERLAP_SAMPLES):
+    """
+    Decodes an audio file into overlapping chunks of chunk_samples + overlap_samples stereo samples
+    and puts them on chunk_queue as (waveform, is_last) tuples, followed by None. An exception
+    raised while decoding is put on the queue instead.
+    A single ffmpeg process streams the whole file, resampled to MODEL_SAMPLE_RATE, so every
+    sample is decoded once however long the file is. Runs in its own thread so decoding
+    overlaps with model loading and inference.
+
+    Args:
+        audio_path (str): Path to the input audio file.
+        chunk_queue (queue.Queue): Bounded queue receiving the decoded waveforms.
+        stop (threading.Event): Set by the consumer to abandon decoding.
+        chunk_samples (int): Distance between chunk starts in samples.
+        overlap_samples (int): Extra samples at the end of each chunk, repeated at the start of the next.
+    """
+    import ffmpeg  # Installed with Spleeter, whose default audio adapter uses it
+
+    frame_bytes = 2 * np.dtype(np.float32).itemsize
+    process = None
+    end = None
+    try:
+        process = (
+            ffmpeg
+            .input(audio_path)
+            .output('pipe:', format='f32le', acodec='pcm_f32le', ac=2, ar=MODEL_SAMPLE_RATE)
+            .global_args('-loglevel', 'error')
+            .run_async(pipe_stdout=True, pipe_stderr=True)
+        )
+        tail = np.zeros((0, 2), dtype=np.float32)
+        while not stop.is_set():
+            wanted = chunk_samples + overlap_samples - tail.shape[0]
+            data = process.stdout.read(wanted * frame_bytes)
+            data = data[:len(data) - len(data) % frame_bytes]
+            block = np.frombuffer(data, dtype=np.float32).reshape(-1, 2)
+            waveform = np.concatenate([tail, block])
+
+            # A short read means ffmpeg reached the end of the file
+            is_last = block.shape[0] < wanted
+            if is_last:
+                _, stderr = process.communicate()
+                if process.returncode != 0:
+                    raise IOError(f"ffmpeg could not decode {audio_path}: {stderr.decode(errors='replace').strip()}")
+
+            put_unless_stopped(chunk_queue, (waveform, is_last), stop)
+            if is_last:
+                break
+            tail = waveform[chunk_samples:]
+    except Exception as e:
+        end = e
+    finally:
+        # Stop ffmpeg if decoding was abandoned or failed part way
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+    put_unless_stopped(chunk_queue, end, stop)
+
+def start_prefetch(audio_path, stop):
+    """
+    Starts decoding an audio file in the background.
+
+    Returns:
+        queue.Queue: Queue the decoded chunks are delivered on.
+    """
+    chunk_queue = queue.Queue(maxsize=PREFETCH_CHUNKS)
+    threading.Thread(
+        target=prefetch_audio,
+        args=(audio_path, chunk_queue, stop),
+        daemon=True
+    ).start()
+    return chunk_queue
+
+# Shared pool that encodes the stems of a chunk concurrently
+STEM_WRITER = ThreadPoolExecutor(max_workers=min(5, os.cpu_count() or 1))
+
+def write_stems(stem_files, stems, stem_directory, sample_rate):
+    """
+    Appends one chunk of every stem to its WAV file, each on its own STEM_WRITER thread.
+    Stem files are opened on the first chunk and kept in stem_files.
+
+    Args:
+        stem_files (dict): Open soundfile.SoundFile per instrument name.
+        stems (dict): Waveform of this chunk per instrument name.
+        stem_directory (str): Directory the stem files are written to.
+        sample_rate (int): Sample rate of the separated audio.
+
+    Returns:
+        list: Futures of the submitted writes.
+    """
+    futures = []
+    for instrument, waveform in stems.items():
+        if instrument not in stem_files:
+            stem_files[instrument] = sf.SoundFile(
+                os.path.join(stem_directory, f"{instrument}.wav"),
+                mode='w',
+                samplerate=sample_rate,
+                channels=waveform.shape[1],
+                subtype='PCM_16'
+            )
+        futures.append(STEM_WRITER.submit(stem_files[instrument].write, waveform))
+    return futures
+
+def audio_duration(audio_path):
+    """
+    Returns the duration of an audio file in seconds, or None if it cannot be probed.
+    """
+    try:
+        import ffmpeg  # Installed with Spleeter, whose default audio adapter uses it
+        return float(ffmpeg.probe(audio_path)['format']['duration'])
+    except Exception:
+        return None
+
+def chunk_and_separate(audio_path, output_directory, separator, chunks, chunk_samples=CHUNK_SAMPLES, overlap_samples=OVERLAP_SAMPLES, on_chunk=None):
+    """
+    Separates an audio file chunk by chunk so memory use stays bounded regardless of its length.
+    Chunks are taken from the queue filled by prefetch_audio.
+    Consecutive chunks overlap by overlap_samples samples and are cross-faded with a linear ramp to hide seams.
+    The stems of each chunk are written in the background while the next chunk is separated.
+    Stems are written to '<output_directory>/<file name>/<instrument>.wav', as separate_to_file does.
+
+    Args:
+        audio_path (str): Path to the input audio file.
+        output_directory (str): Directory the stems are written to.
+        separator (Separator): Separator used for inference.
+        chunks (queue.Queue): Queue returned by start_prefetch for this file.
+        chunk_samples (int): Length of each chunk in samples, excluding the overlap.
+        overlap_samples (int): Length of the cross-faded overlap in samples.
+        on_chunk (callable): Called with the number of seconds separated so far after each chunk.
+    """
+    sample_rate = MODEL_SAMPLE_RATE
+
+    stem_directory = os.path.join(output_directory, Path(audio_path).stem)
+    os.makedirs(stem_directory, exist_ok=True)
+
+    stem_files = {}
+    pending = []
+    try:
+        tails = {}
+        offset = 0
+        while True:
+            chunk = chunks.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if chunk is None or chunk[0].shape[0] == 0:
+                # Flush any overlap left over from the previous chunk
+                if tails:
+                    for future in pending:
+                        future.result()
+                    pending = write_stems(stem_files, tails, stem_directory, sample_rate)
+                break
+            waveform, is_last = chunk
+
+            stems = {}
+            for instrument, separated in separator.separate(waveform).items():
+                separated = separated[:waveform.shape[0]]
+                tail = tails.get(instrument)
+                faded = 0
+                parts = []
+                if tail is not None:
+                    # Cross-fade the previous chunk's tail into the head of this chunk
+                    faded = min(tail.shape[0], separated.shape[0])
+                    ramp = np.linspace(0.0, 1.0, faded, dtype=np.float32)[:, None]
+                    parts.append(tail[:faded] * (1.0 - ramp) + separated[:faded] * ramp)
+                if is_last:
+                    parts.append(separated[faded:])
+                else:
+                    # Slice by index rather than -overlap_samples, which breaks for an overlap of 0
+                    split = separated.shape[0] - overlap_samples
+                    parts.append(separated[faded:split])
+                    tails[instrument] = separated[split:]
+                stems[instrument] = np.concatenate(parts)
+
+            # The previous chunk was written while this one was separated;
+            # it must be finished before appending to the same files
+            for future in pending:
+                future.result()
+            pending = write_stems(stem_files, stems, stem_directory, sample_rate)
+
+            if on_chunk is not None:
+                on_chunk((offset + waveform.shape[0]) / sample_rate)
+
+            if is_last:
+                break
+            offset += chunk_samples
+
+        for future in pending:
+            future.result()
+    finally:
+        wait(pending)
+        for f in stem_files.values():
+            f.close()
 
 # ===============================
 # Define Core Functionality
@@ -78,54 +730,100 @@ os.environ['Spleeter_CACHE_DIR'] = CACHE_DIR  # Corrected environment variable n
 # Global flag to indicate if separation is in progress
 separation_in_progress = False
 
-def separate_audio(audio_path, output_directory, stems):
+# Separator used to join multiple input files in the input field
+PATH_SEPARATOR = ';'
+
+# Milliseconds between steps of the indeterminate progress bar. Kept slow so the
+# Tk event loop wakes up rarely while separation keeps the CPU busy.
+BUSY_INTERVAL_MS = 500
+
+def show_busy():
+    """
+    Animates the progress bar while no real progress is known, e.g. while the model
+    is downloaded and warmed up or when a file's duration cannot be determined.
+    Must be called from the main thread.
+    """
+    if str(progress.cget('mode')) != 'indeterminate':
+        progress.config(mode='indeterminate', value=0)
+        progress.start(BUSY_INTERVAL_MS)
+
+def show_progress(percent):
+    """
+    Shows real progress as a percentage on the progress bar.
+    Must be called from the main thread.
+    """
+    if str(progress.cget('mode')) != 'determinate':
+        progress.stop()
+        progress.config(mode='determinate')
+    progress.config(value=percent)
+
+def separate_audio(audio_paths, output_directory, stems):
     """
-    Separates the audio file into the specified number of stems using Spleeter.
+    Separates each audio file into the specified number of stems using Spleeter.
     This function runs in a separate thread to keep the GUI responsive.
+    All files are processed with the same cached Separator, so the model is loaded only once per batch.
     """
     global separation_in_progress
+    pin_to_physical_cores()
+    stop_prefetch = threading.Event()
     try:
-        progress.start()  # Start the progress bar
-        logging.info(f"Starting separation: {audio_path} into {stems} stems.")
-
-        # Determine the Spleeter model based on selected stems
-        if stems == 2:
-            model = 'spleeter:2stems'
-        elif stems == 4:
-            model = 'spleeter:4stems'
-        elif stems == 5:
-            model = 'spleeter:5stems'
-        else:
-            raise ValueError("Unsupported number of stems. Please choose between 2, 4, or 5.")
-
-        # Initialize the separator with the chosen model
-        separator = Separator(model)  # Removed cache_dir argument
-
-        # Perform the separation
-        separator.separate_to_file(audio_path, output_directory)
+        # Start decoding the first file while the model is fetched and warmed up
+        chunks = start_prefetch(audio_paths[0], stop_prefetch)
+
+        # Show activity until the first chunk reports real progress
+        root.after(0, show_busy)
+        logging.info(f"Starting separation of {len(audio_paths)} file(s) into {stems} stems.")
+
+        # Reuse the cached separator for the chosen model
+        separator = get_separator(stems)
+
+        for index, audio_path in enumerate(audio_paths):
+            logging.info(f"Separating {audio_path}.")
+            duration = audio_duration(audio_path)
+
+            def report_progress(seconds_done, index=index, duration=duration):
+                if not duration:
+                    # Without a duration there is no meaningful percentage
+                    root.after(0, show_busy)
+                    return
+                # Each file takes an equal share of the bar, filled chunk by chunk
+                fraction = min(seconds_done / duration, 1.0)
+                percent = 100.0 * (index + fraction) / len(audio_paths)
+                root.after(0, lambda p=percent: show_progress(p))
+
+            # Decode the next file while this one is separated
+            if index + 1 < len(audio_paths):
+                next_chunks = start_prefetch(audio_paths[index + 1], stop_prefetch)
+
+            chunk_and_separate(audio_path, output_directory, separator, chunks, on_chunk=report_progress)
+            if index + 1 < len(audio_paths):
+                chunks = next_chunks
+            root.after(0, lambda p=100.0 * (index + 1) / len(audio_paths): show_progress(p))
 
         logging.info("Separation completed successfully.")
-        messagebox.showinfo("Success", f"Separation into {stems} stems complete!\nCheck the output directory for results.")
+        messagebox.showinfo("Success", f"Separation of {len(audio_paths)} file(s) into {stems} stems complete!\nCheck the output directory for results.")
     except Exception as e:
         logging.error(f"Separation failed: {e}")
+        root.after(0, lambda: show_progress(0))
         messagebox.showerror("Error", f"An error occurred during separation:\n{e}")
     finally:
-        progress.stop()  # Stop the progress bar
+        stop_prefetch.set()  # Abandon any decoding still in progress
         separation_in_progress = False
         # Re-enable the separation button in the main thread
         root.after(0, lambda: separate_button.config(state='normal'))
 
 def browse_input_file():
     """
-    Opens a file dialog for the user to select an input audio file.
+    Opens a file dialog for the user to select one or more input audio files.
+    Multiple paths are stored in the input field separated by PATH_SEPARATOR.
     """
-    file_path = filedialog.askopenfilename(
-        title="Select Audio File",
+    file_paths = filedialog.askopenfilenames(
+        title="Select Audio Files",
         filetypes=(("Audio Files", "*.mp3 *.wav *.flac *.m4a"), ("All Files", "*.*"))
     )
-    if file_path:
+    if file_paths:
         input_entry.delete(0, tk.END)
-        input_entry.insert(0, file_path)
+        input_entry.insert(0, PATH_SEPARATOR.join(file_paths))
 
 def browse_output_directory():
     """
@@ -146,13 +844,13 @@ def start_separation():
         messagebox.showwarning("Separation In Progress", "A separation task is already running. Please wait until it finishes.")
         return
 
-    audio_path = input_entry.get()
+    audio_paths = [p.strip() for p in input_entry.get().split(PATH_SEPARATOR) if p.strip()]
     output_directory = output_entry.get()
     stems = stem_var.get()
 
     # Input Validation
-    if not audio_path:
-        messagebox.showwarning("Input Needed", "Please select an audio file to separate.")
+    if not audio_paths:
+        messagebox.showwarning("Input Needed", "Please select at least one audio file to separate.")
         return
     if not output_directory:
         messagebox.showwarning("Output Needed", "Please select an output directory.")
@@ -162,17 +860,24 @@ def start_separation():
         return
 
     # User Confirmation
+    if len(audio_paths) == 1:
+        description = f"'{Path(audio_paths[0]).name}'"
+    else:
+        description = f"{len(audio_paths)} files"
     confirm = messagebox.askyesno(
         "Confirm Separation",
-        f"Separate '{Path(audio_path).name}' into {stems} stems and save to '{output_directory}'?"
+        f"Separate {description} into {stems} stems and save to '{output_directory}'?"
     )
     if confirm:
+        # Remember this job for the next launch
+        save_settings(PATH_SEPARATOR.join(audio_paths), output_directory, stems)
+
         separation_in_progress = True
         separate_button.config(state='disabled')  # Disable the button to prevent multiple clicks
         # Start separation in a new thread to keep GUI responsive
         threading.Thread(
             target=separate_audio,
-            args=(audio_path, output_directory, stems),
+            args=(audio_paths, output_directory, stems),
             daemon=True
         ).start()
 
@@ -186,17 +891,21 @@ if __name__ == "__main__":
     root.geometry("600x300")  # Increased height to accommodate new widgets
     root.resizable(False, False)
 
+    # Settings from the previous launch
+    saved = load_settings()
+
     # Configure grid layout
     root.columnconfigure(1, weight=1, minsize=400)
 
     # ===============================
     # Input File Selection
     # ===============================
-    input_label = tk.Label(root, text="Input Audio File:")
+    input_label = tk.Label(root, text="Input Audio Files:")
     input_label.grid(row=0, column=0, padx=10, pady=10, sticky="e")
 
     input_entry = tk.Entry(root, width=50)
     input_entry.grid(row=0, column=1, padx=10, pady=10, sticky="we")
+    input_entry.insert(0, saved.get('in', ''))
 
     browse_input_button = tk.Button(root, text="Browse...", command=browse_input_file)
     browse_input_button.grid(row=0, column=2, padx=10, pady=10)
@@ -209,6 +918,7 @@ if __name__ == "__main__":
 
     output_entry = tk.Entry(root, width=50)
     output_entry.grid(row=1, column=1, padx=10, pady=10, sticky="we")
+    output_entry.insert(0, saved.get('out', ''))
 
     browse_output_button = tk.Button(root, text="Browse...", command=browse_output_directory)
     browse_output_button.grid(row=1, column=2, padx=10, pady=10)
@@ -219,8 +929,9 @@ if __name__ == "__main__":
     stem_label = tk.Label(root, text="Number of Stems:")
     stem_label.grid(row=2, column=0, padx=10, pady=10, sticky="e")
 
-    stem_var = tk.IntVar(value=2)  # Default to 2 stems
     stem_options = [2, 4, 5]  # Supported options
+    saved_stems = saved.get('stems')
+    stem_var = tk.IntVar(value=saved_stems if saved_stems in stem_options else 2)  # Default to 2 stems
 
     stem_menu = tk.OptionMenu(root, stem_var, *stem_options)
     stem_menu.config(width=10)
@@ -235,16 +946,23 @@ if __name__ == "__main__":
         command=start_separation,
         bg="#4CAF50",
         fg="white",
-        font=("Helvetica", 12, "bold")
+        font=("Helvetica", 12, "bold"),
+        state='disabled'  # Enabled by check_ready once Spleeter has been imported
     )
     separate_button.grid(row=3, column=1, pady=20)
 
     # ===============================
     # Progress Bar
     # ===============================
-    progress = ttk.Progressbar(root, orient='horizontal', length=400, mode='indeterminate')
+    progress = ttk.Progressbar(root, orient='horizontal', length=400, mode='determinate', maximum=100)
     progress.grid(row=4, column=0, columnspan=3, padx=10, pady=10)
 
+    # ===============================
+    # Load Spleeter in the Background
+    # ===============================
+    threading.Thread(target=load_spleeter, daemon=True).start()
+    root.after(50, check_ready)
+
     # ===============================
     # Run the Application
     # ===============================